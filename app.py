@@ -1,27 +1,124 @@
 # app.py
+import asyncio
+import hashlib
+import hmac
+import threading
+import time
+from urllib.parse import urlencode
+
 import streamlit as st
+from collections import Counter
 from datetime import datetime
-from math import ceil
+import numpy as np
 import pandas as pd
 
+# the kernels live in their own module so the njit dispatchers survive
+# reruns in sys.modules instead of recompiling with each script execution
+from sizing import RISK_PERCENT, sizing_curve, sizing_kernel  # noqa: F401
+
+try:
+    from orjson import dumps as _json_dumps  # C serializer, ~10x stdlib
+except ImportError:
+    import json
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
+
 # --- Configuration and Constants ---
 DAILY_MAX_TRADES = 4
 DAILY_MAX_PER_SYMBOL = 2
-RISK_PERCENT = 1.0  # 1% default
 DEFAULT_BALANCE = 10000.00
 DEFAULT_SL_POINTS_BUFFER = 20.0
 
-API_KEY = "0m7TQoImay1rDXRXVQ1KR7oHBBJvvPT02M3bBWLFvXmoK4m6Vwp8UzLfeJUh1SKV"
-API_SECRET = "2luiKWQg6m2I1pSiREDYPVKRG3ly0To20siRSqNEActb1bZVzpCRgrnFS5MqswiI"
+# trade log storage: one list per column (SoA). The numeric columns are
+# materialized as float32 at render time — display precision is plenty and
+# the DataFrame build skips per-row dict inspection entirely.
+_TRADE_COLUMNS = ("id", "date", "time", "symbol", "side", "entry", "stop_loss",
+                  "tp1", "tp2", "tps", "units", "notional", "leverage")
+_FLOAT32_COLUMNS = frozenset({"entry", "stop_loss", "tp1", "tp2", "units", "notional", "leverage"})
+_MAX_LOG_ROWS = 1024  # ring-buffer bound: only today's rows are ever displayed
+_LOG_PATH = "trades_log.csv"  # append-only on-disk journal of every order
+
+
+def _append_trade_to_disk(trade):
+    # one appended row per order — history is never rewritten
+    import csv
+    import os
+
+    write_header = not os.path.exists(_LOG_PATH)
+    with open(_LOG_PATH, "a", newline="") as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(_TRADE_COLUMNS)
+        writer.writerow([trade[col] for col in _TRADE_COLUMNS])
+
+
+def _load_today_from_disk(today):
+    """Reload today's journal rows into the session after a server restart."""
+    import csv
+
+    try:
+        f = open(_LOG_PATH, newline="")
+    except FileNotFoundError:
+        return
+    cols = st.session_state.trade_cols
+    max_id = 0
+    with f:
+        for row in csv.DictReader(f):
+            # the seq counter must cover the whole journal, not just today's
+            # slice, or a restart on a later day would reissue old ids
+            max_id = max(max_id, int(row["id"]))
+            if row["date"] != today:
+                continue
+            for col in _TRADE_COLUMNS:
+                val = row[col]
+                if col in _FLOAT32_COLUMNS:
+                    val = float(val)
+                elif col == "id":
+                    val = int(val)
+                cols[col].append(val)
+    st.session_state._trade_seq = max(st.session_state._trade_seq, max_id)
+    if cols["id"]:
+        ss = st.session_state
+        ss.total_by_date[today] = len(cols["id"])
+        ss.by_date_symbol.update(zip(cols["date"], cols["symbol"]))
+        ss.used_capital_by_date[today] = _used_capital_from_log(today)
+        ss.trades_version += 1
+
 
 # ------------------------------------------
 # SESSION STATE INITIALIZER
 # ------------------------------------------
-def initialize_session_state():
-    if "trades" not in st.session_state:
-        st.session_state.trades = []
-    if "stats" not in st.session_state:
-        st.session_state.stats = {}
+try:
+    from streamlit.runtime.secrets import StreamlitSecretNotFoundError as _SecretNotFound
+except ImportError:  # older streamlit raised the plain file error
+    _SecretNotFound = FileNotFoundError
+
+
+def _binance_secrets():
+    # a fresh clone ships no secrets file (only secrets.toml.example) and
+    # st.secrets raises instead of returning the default — simulation mode
+    # must keep running without credentials
+    try:
+        return st.secrets.get("binance", {})
+    except (FileNotFoundError, _SecretNotFound):
+        return {}
+
+
+def initialize_session_state(today=None):
+    if "trade_cols" not in st.session_state:
+        st.session_state.trade_cols = {col: [] for col in _TRADE_COLUMNS}
+    if "total_by_date" not in st.session_state:
+        st.session_state.total_by_date = Counter()
+    if "by_date_symbol" not in st.session_state:
+        st.session_state.by_date_symbol = Counter()
+    if "used_capital_by_date" not in st.session_state:
+        st.session_state.used_capital_by_date = {}
+    if "api_key" not in st.session_state:
+        # read once per session — never hardcoded, never re-serialized per rerun
+        binance = _binance_secrets()
+        st.session_state.api_key = binance.get("api_key", "")
+        st.session_state.api_secret = binance.get("api_secret", "")
 
     if "selected_symbol" not in st.session_state:
         st.session_state.selected_symbol = "BTCUSD"
@@ -33,48 +130,356 @@ def initialize_session_state():
         st.session_state.sizing_method = "POSITION"  # or "LOT"
     if "use_manual" not in st.session_state:
         st.session_state.use_manual = False
+    if "_trade_seq" not in st.session_state:
+        st.session_state._trade_seq = 0
+    if "trades_version" not in st.session_state:
+        st.session_state.trades_version = 0
+
+    if "_log_loaded" not in st.session_state:
+        st.session_state._log_loaded = True
+        _load_today_from_disk(today or datetime.utcnow().date().isoformat())
 
 
 # ------------------------------------------
-# CAPITAL CALCULATOR
+# SIMULATED MARKET DATA & CHART
 # ------------------------------------------
-def calculate_unutilized_capital(balance):
-    # sum notional/leverage for active trades
-    return balance - sum(t.get("notional", 0) / max(1, t.get("leverage", 1)) for t in st.session_state.trades)
+@st.cache_data(show_spinner=False)
+def generate_simulated_data(symbol="BTCUSD", base_price=27050.0, volatility=None):
+    # simulated OHLCV history — replace with broker klines as needed.
+    # Cached and seeded: generation runs once per symbol per session, and the
+    # deterministic frame lets the figure cache downstream hit as well.
+    # All columns are built as float32 ndarrays first, then wrapped in a
+    # DataFrame once: no shift/fillna temporaries, no axis=1 reductions.
+    rng = np.random.default_rng(0)
+    if volatility is None:
+        # scale with price level (≈45 for BTCUSD) so every symbol's candles
+        # stay proportional to its live price
+        volatility = base_price / 600.0
+    dates = pd.date_range(end=datetime.utcnow().date(), periods=80, freq="15min")
+    close = base_price + rng.standard_normal(80).cumsum().astype(np.float32) * volatility
+    open_ = np.empty_like(close)
+    open_[0] = base_price
+    open_[1:] = close[:-1]
+    high = np.maximum(open_, close) + (rng.uniform(0.1, 0.45, 80) * volatility).astype(np.float32)
+    low = np.minimum(open_, close) - (rng.uniform(0.1, 0.45, 80) * volatility).astype(np.float32)
+    volume = rng.integers(5000, 15000, 80, dtype=np.int32)
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=dates,
+    )
+
+
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: lambda df: pd.util.hash_pandas_object(df, index=True).values.tobytes()},
+)
+def plot_candlestick_chart(data: pd.DataFrame):
+    # Plotly serializes a small JSON payload and renders client-side, so the
+    # server no longer rasterizes a PNG per rerun. Figures pickle cleanly,
+    # hence st.cache_data. Imported lazily: sessions pay the plotly import
+    # on first chart build only, and cache hits skip it entirely.
+    import plotly.graph_objects as go
+    # 20-period SMA via cumulative sums — one C pass, no rolling-engine dispatch
+    close = data["Close"].to_numpy(dtype=np.float64)
+    csum = np.concatenate(([0.0], np.cumsum(close)))
+    ma20 = np.concatenate((np.full(19, np.nan), (csum[20:] - csum[:-20]) / 20.0))
+    fig = go.Figure(
+        data=[
+            go.Candlestick(
+                x=data.index,
+                open=data["Open"], high=data["High"],
+                low=data["Low"], close=data["Close"],
+                increasing_line_color="#00cc77",
+                decreasing_line_color="#ff4d4d",
+            ),
+            go.Scatter(x=data.index, y=ma20, name="MA20", line=dict(color="#00aaff")),
+        ]
+    )
+    fig.update_layout(template="plotly_dark", xaxis_rangeslider_visible=False, showlegend=False)
+    return fig
 
 
-def get_account_balance(api_key, api_secret):
-    # replace with broker API call as needed
+# ------------------------------------------
+# CAPITAL CALCULATOR
+# ------------------------------------------
+def calculate_unutilized_capital(balance, today=None):
+    # O(1): running per-date total maintained in execute_trade_action
+    if today is None:
+        today = datetime.utcnow().date().isoformat()
+    return max(0.0, balance - st.session_state.used_capital_by_date.get(today, 0.0))
+
+
+def _used_capital_from_log(today):
+    """Recompute today's used capital from the log in one numpy reduction.
+
+    The running counter in execute_trade_action is authoritative; this is
+    the resync path when the counter has to be rebuilt (e.g. after loading
+    a persisted log), replacing a Python generator sum over rows.
+    """
+    cols = st.session_state.trade_cols
+    if not cols["notional"]:
+        return 0.0
+    mask = np.asarray(cols["date"]) == today
+    if not mask.any():
+        return 0.0
+    notional = np.asarray(cols["notional"], dtype=np.float32)[mask]
+    leverage = np.maximum(np.asarray(cols["leverage"], dtype=np.float32)[mask], 1.0)
+    return float((notional / leverage).sum())
+
+
+@st.cache_resource(show_spinner=False)
+def get_rest_session():
+    # one keep-alive session per process — the TLS handshake to the broker is
+    # paid once instead of on every REST call
+    import requests
+
+    session = requests.Session()
+    session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def get_account_balance():
+    # TTL cache: one balance round-trip per 15 s instead of one per rerun.
+    # Keys are read from st.secrets inside so they stay out of the cache key.
+    if LIVE_TRADING:
+        binance = _binance_secrets()
+        api_key = binance.get("api_key", "")
+        api_secret = binance.get("api_secret", "")
+        params = {"timestamp": int(datetime.utcnow().timestamp() * 1000)}
+        params["signature"] = hmac.new(
+            api_secret.encode(), urlencode(params).encode(), hashlib.sha256
+        ).hexdigest()
+        resp = get_rest_session().get(
+            BROKER_BASE_URL + "/fapi/v2/balance",
+            headers={"X-MBX-APIKEY": api_key}, params=params, timeout=5,
+        )
+        resp.raise_for_status()
+        return float(next(b["balance"] for b in resp.json() if b["asset"] == "USDT"))
     return DEFAULT_BALANCE
 
 
+# In production: replace with broker API symbol list
+SYMBOLS = ("BTCUSD", "ETHUSD", "ADAUSD")
+SYMBOL_BASE_PRICES = {"BTCUSD": 27050.0, "ETHUSD": 1850.0, "ADAUSD": 0.29}
+
+@st.cache_resource(show_spinner=False)
+def _price_stream_state():
+    # one process-wide home for pushed prices and the started-stream
+    # registry. Module globals are NOT process-persistent — Streamlit
+    # re-executes the script in a fresh namespace every rerun — so only a
+    # cache_resource container keeps the workers and their readers on the
+    # same dict and arms the started-guard exactly once.
+    return {"prices": {}, "started": set(), "lock": threading.Lock()}
+
+
+def _price_stream_worker(symbol, prices):
+    import json
+    import time
+
+    import websockets
+
+    stream = f"{symbol.lower()}t@ticker"  # BTCUSD -> btcusdt stream name
+
+    async def _run():
+        async with websockets.connect(f"wss://stream.binance.com:9443/ws/{stream}") as ws:
+            async for msg in ws:
+                prices[symbol] = float(json.loads(msg)["c"])
+
+    while True:
+        try:
+            asyncio.run(_run())
+        except Exception:
+            time.sleep(1.0)  # reconnect backoff
+
+
+def start_price_stream(symbol):
+    # one daemon thread per symbol keeps a websocket ticker open, so reruns
+    # read a dict instead of polling REST
+    try:
+        import websockets  # noqa: F401 — optional dependency
+    except ImportError:
+        return  # fall back to the TTL-cached polling path
+    state = _price_stream_state()
+    with state["lock"]:
+        if symbol in state["started"]:
+            return
+        state["started"].add(symbol)
+    threading.Thread(
+        target=_price_stream_worker, args=(symbol, state["prices"]), daemon=True
+    ).start()
+
+
+@st.cache_data(ttl=1.0, show_spinner=False)
+def _poll_live_price(symbol):
+    # TTL cache: at most one refresh per second across reruns. Keys are read
+    # from st.secrets inside so they never become part of the cache key.
+    creds = _binance_secrets()  # noqa: F841 — used by the real broker ticker call
+    # replace with broker ticker call as needed — simulated drift for now
+    base = SYMBOL_BASE_PRICES.get(symbol, 100.0)
+    drift = (datetime.utcnow().second - 30) / 30.0
+    return base * (1.0 + 0.001 * drift)
+
+
+def fetch_live_price(symbol):
+    # pushed price if the stream is up, polled/simulated price otherwise
+    price = _price_stream_state()["prices"].get(symbol)
+    if price is not None:
+        return price
+    return _poll_live_price(symbol)
+
+
 # ------------------------------------------
 # POSITION SIZING (1% risk default)
 # ------------------------------------------
-def calculate_position_sizing(balance, entry, sl_price):
-    sl_points = abs(entry - sl_price)
-    if sl_points <= 0:
-        return 0.0, 1, 0.0, "INVALID SL"
+_SIZING_STATUS = ("OK", "INVALID SL", "NO CAPITAL", "TOO SMALL")
+
+# Inline minimal CSS to keep controls compact — built once at import
+_CSS = """
+<style>
+.stApp { background-color:#0b0f12; color:#e6e6e6; }
+.compact { padding:6px; margin:0; }
+.status { background:#071921; padding:8px; border-radius:6px; border:1px solid #0b5d7a; }
+</style>
+"""
+
+
+@st.cache_resource(show_spinner=False)
+def _load_css():
+    # read the full stylesheet from disk once per server process; the small
+    # inline block stays as the fallback when the file is missing
+    try:
+        with open("styles.css") as f:
+            return f"<style>{f.read()}</style>" + _CSS
+    except FileNotFoundError:
+        return _CSS
+
+# status row template — parsed once at import instead of per rerun; the
+# daily counters ride in the same block so one delta covers both rows
+_STATUS_TMPL = (
+    '<div class="status">Units: <strong>{units}</strong>  |  '
+    "Lev: <strong>{lev}x</strong>  |  Risk: <strong>${risk}</strong><br>"
+    "<small>Daily: {total}/{max_total}  •  {symbol}: {sym_total}/{max_sym}</small></div>"
+)
+
+
+def calculate_position_sizing(balance, entry, sl_price, today=None):
+    unutil_capital = calculate_unutilized_capital(balance, today)
+    units, lev, risk_amount, status = sizing_kernel(unutil_capital, entry, abs(entry - sl_price))
+    return round(units, 6), lev, round(risk_amount, 2), _SIZING_STATUS[status]
 
-    unutil_capital = calculate_unutilized_capital(balance)
-    if unutil_capital <= 0:
-        return 0.0, 1, 0.0, "NO CAPITAL"
 
-    risk_amount = (unutil_capital * RISK_PERCENT) / 100.0
-    # units = risk / (sl_points * price-per-unit) — approximate using entry as price-per-unit
-    # to keep unit scale reasonable, we use units = risk_amount / (sl_points)
-    # then notional = units * entry, leverage suggested to fit notional in capital (ceil to integer)
-    units = risk_amount / max(1e-9, sl_points)
-    if units <= 0:
-        return 0.0, 1, 0.0, "TOO SMALL"
+# ------------------------------------------
+# CHART & LOG FRAGMENTS
+# ------------------------------------------
+_LONG_CSS = "color: white; background-color: #00cc77"
+_SHORT_CSS = "color: white; background-color: #ff4d4d"
+
+# SL sits below entry for longs, above for shorts — one hash lookup, no branch
+_SIDE_SL_SIGN = {"LONG": 1.0, "SHORT": -1.0}
+
+
+def _side_styles(col):
+    # one vectorized np.where instead of a per-cell Python callback
+    return np.where(col.values == "LONG", _LONG_CSS, _SHORT_CSS)
+
+
+
+@st.fragment
+def render_chart():
+    # fragment: order-entry widget changes no longer re-render the chart
+    symbol = st.session_state.selected_symbol
+    data = generate_simulated_data(symbol, SYMBOL_BASE_PRICES.get(symbol, 100.0))
+    st.plotly_chart(plot_candlestick_chart(data), use_container_width=True)
+
+
+def _build_today_df(version, today):
+    # session-scoped memo keyed on the trades version counter: unrelated
+    # reruns reuse the cached frame, only a trade append (version bump)
+    # rebuilds it. st.cache_data would be wrong here — it is process-global
+    # while the underlying columns are per-session.
+    cached = st.session_state.get("_log_df_cache")
+    if cached is not None and cached[0] == (version, today):
+        return cached[1]
+    cols = st.session_state.trade_cols
+    mask = np.asarray(cols["date"]) == today  # vectorized C-level compare
+    df = None
+    if mask.any():
+        df = pd.DataFrame({
+            col: np.asarray(cols[col], dtype=np.float32 if col in _FLOAT32_COLUMNS else None)[mask]
+            for col in ("time", "symbol", "side", "entry", "stop_loss", "tps", "units", "leverage")
+        })
+    st.session_state._log_df_cache = ((version, today), df)
+    return df
+
+
+@st.fragment
+def render_trade_log(today):
+    st.subheader("Today's Trades")
+    df = _build_today_df(st.session_state.trades_version, today)
+    if df is not None:
+        st.dataframe(df.style.apply(_side_styles, subset=["side"]), use_container_width=True, hide_index=True)
+        st.download_button(
+            "Download log (JSON)",
+            data=_json_dumps(st.session_state.trade_cols),
+            file_name="trades.json",
+            mime="application/json",
+        )
+    else:
+        st.info("No trades today.")
 
-    # naive leverage suggestion: ensure notional/lev <= unutil_capital  => lev >= notional / unutil_capital
-    notional = units * entry
-    suggested_lev = max(1, ceil((notional / unutil_capital) if unutil_capital > 0 else 1))
-    # clamp suggested leverage to reasonable max (example 50)
-    suggested_lev = min(suggested_lev, 50)
 
-    return round(units, 6), suggested_lev, round(risk_amount, 2), "OK"
+# ------------------------------------------
+# BROKER ORDER PLACEMENT (LIVE PATH)
+# ------------------------------------------
+LIVE_TRADING = False  # keep simulation until broker credentials are vetted
+BROKER_BASE_URL = "https://testnet.binancefuture.com"
+
+
+def _signed_order_params(api_secret, symbol, side, order_type, quantity, price=None, stop_price=None):
+    params = {
+        "symbol": symbol,
+        "side": side,
+        "type": order_type,
+        "quantity": f"{quantity:.6f}",
+        "timestamp": int(datetime.utcnow().timestamp() * 1000),
+    }
+    if price is not None:
+        params["price"] = f"{price:.6f}"
+    if stop_price is not None:
+        params["stopPrice"] = f"{stop_price:.6f}"
+    query = urlencode(params)
+    params["signature"] = hmac.new(api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+    return params
+
+
+async def place_broker_order(api_key, api_secret, symbol, side, entry, sl, units, order_type, tp1, tp2):
+    # one pooled session per submission: the main leg goes first, then the
+    # SL/TP legs fire concurrently so N serial round-trips become ~1 RTT
+    import aiohttp  # optional dependency — only needed when LIVE_TRADING
+
+    close_side = "SELL" if side == "LONG" else "BUY"
+    url = BROKER_BASE_URL + "/fapi/v1/order"
+    headers = {"X-MBX-APIKEY": api_key}
+    connector = aiohttp.TCPConnector(limit=10, keepalive_timeout=60)
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        main = _signed_order_params(
+            api_secret, symbol, "BUY" if side == "LONG" else "SELL", order_type,
+            units, price=entry if order_type == "LIMIT" else None,
+        )
+        async with session.post(url, params=main) as resp:
+            resp.raise_for_status()
+
+        legs = [_signed_order_params(api_secret, symbol, close_side, "STOP_MARKET", units, stop_price=sl)]
+        for tp in (tp1, tp2):
+            if tp > 0:
+                legs.append(
+                    _signed_order_params(api_secret, symbol, close_side, "TAKE_PROFIT_MARKET",
+                                         units / 2.0, stop_price=tp)
+                )
+        responses = await asyncio.gather(*(session.post(url, params=leg) for leg in legs))
+        for resp in responses:
+            resp.raise_for_status()
 
 
 # ------------------------------------------
@@ -82,28 +487,54 @@ def calculate_position_sizing(balance, entry, sl_price):
 # ------------------------------------------
 def execute_trade_action(balance, symbol, side, entry, sl, units, leverage, order_type, tp1, tp2):
     notional_to_use = units * entry
-    now = datetime.utcnow()
+    # struct_time + f-strings: skips the datetime object and strftime call
+    tm = time.gmtime()
 
+    st.session_state._trade_seq += 1
     trade = {
-        "id": int(now.timestamp() * 1000),
-        "date": now.date().isoformat(),
-        "time": now.strftime("%H:%M:%S UTC"),
+        "id": st.session_state._trade_seq,
+        "date": f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}",
+        "time": f"{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d} UTC",
         "symbol": symbol,
         "side": side,
         "entry": entry,
         "stop_loss": sl,
         "tp1": tp1,
         "tp2": tp2,
+        # formatted once at insertion — the log renders this string as-is
+        "tps": " / ".join(f"TP{i}: ${tp:,.2f}" for i, tp in enumerate((tp1, tp2), 1) if tp > 0) or "—",
         "units": units,
         "notional": notional_to_use,
         "leverage": leverage,
     }
 
-    st.session_state.trades.append(trade)
-
-    today = now.date().isoformat()
-    st.session_state.stats.setdefault(today, {"total": 0, "by_symbol": {}})["total"] += 1
-    st.session_state.stats[today]["by_symbol"][symbol] = st.session_state.stats[today]["by_symbol"].get(symbol, 0) + 1
+    # bind once — every st.session_state access goes through the proxy's
+    # __getattr__/__getitem__, so local references halve the dispatch cost
+    ss = st.session_state
+    cols = ss.trade_cols
+    for col in _TRADE_COLUMNS:
+        cols[col].append(trade[col])
+    if len(cols["id"]) > _MAX_LOG_ROWS:
+        # drop the oldest row — appends only ever exceed the bound by one
+        for col in _TRADE_COLUMNS:
+            del cols[col][0]
+    _append_trade_to_disk(trade)
+
+    today = trade["date"]
+    used = ss.used_capital_by_date
+    used[today] = used.get(today, 0.0) + notional_to_use / max(1, leverage)
+    ss.total_by_date[today] += 1
+    ss.by_date_symbol[(today, symbol)] += 1
+    ss.trades_version += 1  # invalidates the cached log view
+
+    if LIVE_TRADING:
+        asyncio.run(
+            place_broker_order(
+                st.session_state.api_key, st.session_state.api_secret,
+                symbol, side, entry, sl, units, order_type, tp1, tp2,
+            )
+        )
+        return f"LIVE: Order placed (units={units:.6f}, lev={leverage}x)"
 
     return f"SIMULATION: Order placed (units={units:.6f}, lev={leverage}x)"
 
@@ -113,28 +544,14 @@ def execute_trade_action(balance, symbol, side, entry, sl, units, leverage, orde
 # ------------------------------------------
 def app():
     st.set_page_config(page_title="Risk Manager — Single Page", layout="wide")
-    initialize_session_state()
-    balance = get_account_balance(API_KEY, API_SECRET)
-
-    # --- Optional: load external styles.css if you want to use it ---
-    # If you keep styles.css in the same folder and want to inject it:
-    # try:
-    #     with open("styles.css") as f:
-    #         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    # except FileNotFoundError:
-    #     pass
-
-    # Inline minimal CSS to keep controls compact
-    st.markdown(
-        """
-        <style>
-        .stApp { background-color:#0b0f12; color:#e6e6e6; }
-        .compact { padding:6px; margin:0; }
-        .status { background:#071921; padding:8px; border-radius:6px; border:1px solid #0b5d7a; }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    today = datetime.utcnow().date().isoformat()  # computed once per rerun
+    initialize_session_state(today)
+    balance = get_account_balance()
+
+    # emitted every run — Streamlit drops elements that are not re-emitted,
+    # so the style block must be part of each script run. The expensive part
+    # (the file read) is cached per process via st.cache_resource.
+    st.markdown(_load_css(), unsafe_allow_html=True)
 
     # layout: left control column (compact single-page), right log/chart
     col_ctrl, col_right = st.columns([1, 1], gap="large")
@@ -146,130 +563,142 @@ def app():
         st.header("Order Entry")
 
         # Row 1: Symbol (toggle), Side, Order type
-        # In production: replace symbol list with broker API symbol list
-        symbols = ["BTCUSD", "ETHUSD", "ADAUSD"]  # fetched from broker API in future
         sym_col, side_col, ord_col = st.columns([2, 1, 1])
         with sym_col:
-            st.session_state.selected_symbol = st.radio("", symbols, index=symbols.index(st.session_state.selected_symbol))
+            st.session_state.selected_symbol = st.radio("", SYMBOLS, index=SYMBOLS.index(st.session_state.selected_symbol))
         with side_col:
             st.session_state.selected_side = st.radio("", ["LONG", "SHORT"], index=0 if st.session_state.selected_side == "LONG" else 1, horizontal=True)
         with ord_col:
             order_type = st.radio("", ["MARKET", "LIMIT"], index=0, horizontal=True)
 
-        # Row 2: Balance metric and available capital
-        cap_col, used_col = st.columns(2)
+        # Row 2: Balance metric, available capital, live price
+        cap_col, used_col, price_col = st.columns(3)
         with cap_col:
             st.metric("Balance", f"{balance:,.2f}")
         with used_col:
-            used = DEFAULT_BALANCE - calculate_unutilized_capital(DEFAULT_BALANCE)
+            used = DEFAULT_BALANCE - calculate_unutilized_capital(DEFAULT_BALANCE, today)
             st.metric("Margin Used", f"{used:,.2f}")
-
-        # Row 3: Entry and SL method (POINTS / %)
-        e_col, sm_col = st.columns([2, 1])
-        with e_col:
+        with price_col:
+            start_price_stream(st.session_state.selected_symbol)
+            live_price = fetch_live_price(st.session_state.selected_symbol)
+            st.metric("Live Price", f"{live_price:,.2f}")
+
+        # SL method stays outside the form like symbol/side: it gates which
+        # SL widgets render, so toggling it must rerun immediately
+        st.session_state.sl_method = st.radio("", ["POINTS", "PERCENT"], index=0, horizontal=True, label_visibility="collapsed")
+
+        # order entry form: edits are batched — the script reruns once per
+        # submit instead of once per keystroke across ~10 fields
+        with st.form("order_form"):
+            # Row 3: Entry
             entry = st.number_input("", value=27050.0, min_value=0.0, format="%.6f", key="entry_input", label_visibility="collapsed")
-        with sm_col:
-            st.session_state.sl_method = st.radio("", ["POINTS", "PERCENT"], index=0, horizontal=True, label_visibility="collapsed")
 
-        # Row 4: SL inputs (compact)
-        if st.session_state.sl_method == "POINTS":
-            s1_col, s2_col = st.columns([1, 1])
-            with s1_col:
-                sl_points = st.number_input("", value=100.0, min_value=0.0, key="sl_points", label_visibility="collapsed")
-            # compute default SL price
-            default_sl = entry - sl_points if st.session_state.selected_side == "LONG" else entry + sl_points
-            with s2_col:
-                sl_price = st.number_input("", value=round(default_sl, 6), min_value=0.0, format="%.6f", key="sl_price", label_visibility="collapsed")
-        else:
+            # Row 4: SL inputs (compact) — both methods normalize to a point
+            # distance so one shared expression computes the default SL price
+            sl_sign = _SIDE_SL_SIGN[st.session_state.selected_side]
             s1_col, s2_col = st.columns([1, 1])
-            with s1_col:
-                sl_percent = st.number_input("", value=1.0, min_value=0.01, format="%.2f", key="sl_pct", label_visibility="collapsed")
-            sl_move = entry * (sl_percent / 100.0)
-            default_sl = entry - sl_move if st.session_state.selected_side == "LONG" else entry + sl_move
+            if st.session_state.sl_method == "POINTS":
+                with s1_col:
+                    sl_points = st.number_input("", value=100.0, min_value=0.0, key="sl_points", label_visibility="collapsed")
+                sl_key = "sl_price"
+            else:
+                with s1_col:
+                    sl_percent = st.number_input("", value=1.0, min_value=0.01, format="%.2f", key="sl_pct", label_visibility="collapsed")
+                sl_points = entry * (sl_percent / 100.0)
+                sl_key = "sl_price_pct"
+            if sl_key not in st.session_state:
+                # keyed widgets read from session state after first render, so
+                # seed the default once rather than recomputing value= per rerun
+                st.session_state[sl_key] = round(entry - sl_sign * sl_points, 6)
             with s2_col:
-                sl_price = st.number_input("", value=round(default_sl, 6), min_value=0.0, format="%.6f", key="sl_price_pct", label_visibility="collapsed")
-
-        # Row 5: Position sizing method toggle (Position / Lot)
-        s_method_col, manual_col = st.columns([2, 1])
-        with s_method_col:
-            sizing_choice = st.radio("", ["POSITION SIZE", "LOT SIZE"], index=0, horizontal=True, label_visibility="collapsed")
-        # Show manual inputs (if user wants to override, they enter >0; otherwise recommended used)
-        with manual_col:
-            user_units = st.number_input("", min_value=0.0, value=0.0, format="%.6f", key="user_units", label_visibility="collapsed")
-            user_lev = st.number_input("", min_value=1.0, value=1.0, step=1.0, key="user_leverage", label_visibility="collapsed")
-
-        # Row 6: TP1 and TP2 (compact)
-        tp1_col, tp2_col = st.columns(2)
-        with tp1_col:
-            tp1 = st.number_input("", value=0.0, format="%.6f", key="tp1", label_visibility="collapsed")
-        with tp2_col:
-            tp2 = st.number_input("", value=0.0, format="%.6f", key="tp2", label_visibility="collapsed")
+                sl_price = st.number_input("", min_value=0.0, format="%.6f", key=sl_key, label_visibility="collapsed")
+
+            # Row 5: Position sizing method toggle (Position / Lot)
+            s_method_col, manual_col = st.columns([2, 1])
+            with s_method_col:
+                sizing_choice = st.radio("", ["POSITION SIZE", "LOT SIZE"], index=0, horizontal=True, label_visibility="collapsed")
+            # Show manual inputs (if user wants to override, they enter >0; otherwise recommended used)
+            with manual_col:
+                user_units = st.number_input("", min_value=0.0, value=0.0, format="%.6f", key="user_units", label_visibility="collapsed")
+                user_lev = st.number_input("", min_value=1.0, value=1.0, step=1.0, key="user_leverage", label_visibility="collapsed")
+
+            # Row 6: TPs — one data_editor instead of two number_inputs, so a
+            # single widget is reconciled per rerun (0 leaves a TP unused)
+            tps = st.data_editor(
+                pd.DataFrame({"price": [0.0, 0.0]}, index=["TP1", "TP2"]),
+                num_rows="fixed", key="tps_editor", use_container_width=True,
+            )
+            tp1 = float(tps["price"].iloc[0])
+            tp2 = float(tps["price"].iloc[1])
+
+            submitted = st.form_submit_button("Place Order")
 
         # compute recommended sizing
-        rec_units, rec_lev, risk_value, msg = calculate_position_sizing(balance, entry, sl_price)
-
-        # status row (very compact, no extra text)
-        st.markdown(f'<div class="status">Units: <strong>{rec_units}</strong>  |  Lev: <strong>{rec_lev}x</strong>  |  Risk: <strong>${risk_value}</strong></div>', unsafe_allow_html=True)
-
-        # daily counters
-        today = datetime.utcnow().date().isoformat()
-        stats = st.session_state.stats.get(today, {"total": 0, "by_symbol": {}})
-        total_today = stats["total"]
-        symbol_today = stats["by_symbol"].get(st.session_state.selected_symbol, 0)
-        st.caption(f"Daily: {total_today}/{DAILY_MAX_TRADES}  •  {st.session_state.selected_symbol}: {symbol_today}/{DAILY_MAX_PER_SYMBOL}")
-
-        # Buttons: Reset disabled, Place / Execute
-        btn_col1, btn_col2 = st.columns(2)
-        with btn_col1:
-            st.button("RESET DAILY LIMITS", disabled=True)
-        with btn_col2:
-            if st.button("Place Order"):
-                # validations exactly as requested
-                if sl_price <= 0:
-                    st.error("STOP LOSS REQUIRED.")
-                    st.stop()
-
-                if total_today >= DAILY_MAX_TRADES:
-                    st.error("DAILY LIMIT REACHED.")
-                    st.stop()
-
-                if symbol_today >= DAILY_MAX_PER_SYMBOL:
-                    st.error("SYMBOL LIMIT REACHED.")
-                    st.stop()
-
-                # Use recommended if user left manual at 0
-                final_units = user_units if user_units > 0 else rec_units
-                final_lev = int(user_lev) if user_lev > 0 else int(rec_lev)
-
-                # Restrict user overrides: cannot exceed recommended
-                if user_units > 0 and user_units > rec_units:
-                    st.error(f"Quantity too high! Max allowed: {rec_units}")
-                    st.stop()
-
-                if user_lev > 0 and user_lev > rec_lev:
-                    st.error(f"Leverage too high! Max allowed: {rec_lev}x")
-                    st.stop()
-
-                # Execute (simulation)
-                result = execute_trade_action(balance, st.session_state.selected_symbol, st.session_state.selected_side, entry, sl_price, final_units, final_lev, order_type, tp1, tp2)
-                st.success(result)
-                st.experimental_rerun()
+        rec_units, rec_lev, risk_value, msg = calculate_position_sizing(balance, entry, sl_price, today)
+
+        # daily counters — Counter returns 0 for missing keys, one hash each
+        total_today = st.session_state.total_by_date[today]
+        symbol_today = st.session_state.by_date_symbol[(today, st.session_state.selected_symbol)]
+
+        # status row + counters in one markdown call (one delta instead of two)
+        st.markdown(
+            _STATUS_TMPL.format(
+                units=rec_units, lev=rec_lev, risk=risk_value,
+                total=total_today, max_total=DAILY_MAX_TRADES,
+                symbol=st.session_state.selected_symbol,
+                sym_total=symbol_today, max_sym=DAILY_MAX_PER_SYMBOL,
+            ),
+            unsafe_allow_html=True,
+        )
+
+        # what-if scan: suggested units/leverage across a band of SL distances
+        with st.expander("What-if: sizing vs SL distance"):
+            sl_range = np.linspace(max(1.0, sl_points * 0.25), max(2.0, sl_points * 2.0), 60)
+            curve_units, curve_lev = sizing_curve(calculate_unutilized_capital(balance, today), entry, sl_range)
+            st.line_chart(pd.DataFrame({"units": curve_units, "leverage": curve_lev}, index=sl_range))
+
+        st.button("RESET DAILY LIMITS", disabled=True)
+
+        if submitted:
+            # validations exactly as requested
+            if sl_price <= 0:
+                st.error("STOP LOSS REQUIRED.")
+                st.stop()
+
+            if total_today >= DAILY_MAX_TRADES:
+                st.error("DAILY LIMIT REACHED.")
+                st.stop()
+
+            if symbol_today >= DAILY_MAX_PER_SYMBOL:
+                st.error("SYMBOL LIMIT REACHED.")
+                st.stop()
+
+            # Use recommended if user left manual at 0
+            final_units = user_units if user_units > 0 else rec_units
+            final_lev = int(user_lev) if user_lev > 0 else int(rec_lev)
+
+            # Restrict user overrides: cannot exceed recommended
+            if user_units > 0 and user_units > rec_units:
+                st.error(f"Quantity too high! Max allowed: {rec_units}")
+                st.stop()
+
+            if user_lev > 0 and user_lev > rec_lev:
+                st.error(f"Leverage too high! Max allowed: {rec_lev}x")
+                st.stop()
+
+            # Execute (simulation)
+            result = execute_trade_action(balance, st.session_state.selected_symbol, st.session_state.selected_side, entry, sl_price, final_units, final_lev, order_type, tp1, tp2)
+            st.success(result)
+            st.rerun()
 
     # --------------------------
     # RIGHT: chart & trade log
     # --------------------------
     with col_right:
         st.header("Chart / Log")
-        st.markdown("Chart placeholder — integrate your chart component here.")
+        render_chart()
         st.markdown("---")
-        st.subheader("Today's Trades")
-        today_trades = [t for t in st.session_state.trades if t["date"] == datetime.utcnow().date().isoformat()]
-        if today_trades:
-            df = pd.DataFrame(today_trades)
-            df = df[["time", "symbol", "side", "entry", "stop_loss", "tp1", "tp2", "units", "leverage"]]
-            st.dataframe(df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No trades today.")
+        render_trade_log(today)
 
 if __name__ == "__main__":
     app()
@@ -0,0 +1,72 @@
+# sizing.py — position-sizing kernels, JIT-compiled when numba is available.
+#
+# Kept out of app.py on purpose: Streamlit re-executes the main script in a
+# fresh namespace on every rerun, but imported modules persist in
+# sys.modules, so the njit dispatchers (and the lru_cache fallback) are
+# built once per process and the compile/warmup cost is genuinely paid once.
+import numpy as np
+
+try:
+    from numba import njit
+    _HAVE_NUMBA = True
+except ImportError:  # numba is optional — memoize the pure-Python fallback
+    _HAVE_NUMBA = False
+    from functools import lru_cache
+
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            # scalar-float args hash cheaply, and reruns repeat identical
+            # inputs, so an lru_cache recovers most of the JIT win
+            return lru_cache(maxsize=128)(fn)
+        return wrap
+
+RISK_PERCENT = 1.0  # 1% default
+_RISK_FRAC = RISK_PERCENT / 100.0  # hoisted: divided once at import, not per call
+
+
+# eager signature: compiled at import (then served from the on-disk cache)
+# instead of on the first order-entry interaction
+@njit("Tuple((float64, int64, float64, int64))(float64, float64, float64)",
+      cache=True, fastmath=True)
+def sizing_kernel(unutil_capital, entry, sl_points):
+    # pure scalar math — JIT-compiled to native code when numba is available
+    if sl_points <= 0.0:
+        return 0.0, 1, 0.0, 1
+    if unutil_capital <= 0.0:
+        return 0.0, 1, 0.0, 2
+
+    risk_amount = unutil_capital * _RISK_FRAC
+    # units = risk / (sl_points * price-per-unit) — approximate using entry as price-per-unit
+    # to keep unit scale reasonable, we use units = risk_amount / (sl_points)
+    # then notional = units * entry, leverage suggested to fit notional in capital (ceil to integer)
+    units = risk_amount / max(1e-9, sl_points)
+    if units <= 0.0:
+        return 0.0, 1, 0.0, 3
+
+    # naive leverage suggestion: ensure notional/lev <= unutil_capital  => lev >= notional / unutil_capital
+    notional = units * entry
+    ratio = notional / unutil_capital
+    # ceil via truncation — avoids a math.ceil call in the non-JIT fallback;
+    # under numba LLVM lowers this to a truncate/compare pair
+    suggested_lev = max(1, int(ratio) + (1 if ratio != int(ratio) else 0))
+    # clamp suggested leverage to reasonable max (example 50)
+    suggested_lev = min(suggested_lev, 50)
+
+    return units, suggested_lev, risk_amount, 0
+
+
+def sizing_curve(unutil_capital, entry, sl_points_arr):
+    # batch what-if scan across candidate SL distances; the explicit loop
+    # compiles well under numba and is cheap in the fallback (N~60 scalars)
+    n = sl_points_arr.shape[0]
+    out_units = np.empty(n)
+    out_lev = np.empty(n)
+    for i in range(n):
+        units, lev, _, _ = sizing_kernel(unutil_capital, entry, sl_points_arr[i])
+        out_units[i] = units
+        out_lev[i] = float(lev)
+    return out_units, out_lev
+
+
+if _HAVE_NUMBA:
+    sizing_curve = njit(cache=True, fastmath=True)(sizing_curve)